@@ -1,77 +1,454 @@
+import atexit
 import json
 import logging
-import time
+import threading
+import orjson
 import requests
+import requests_cache
+import soupsieve
+from collections import defaultdict
+from contextlib import contextmanager
+from email.message import Message
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 
 # Configure logging
 logging.basicConfig(filename="output/scraper.log", level=logging.INFO, 
                     format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Shared HTTP sessions: keep-alive connections are reused across pages and sites,
+# and transient failures are retried by urllib3 instead of a Python loop. Static
+# pages additionally go through an on-disk HTTP cache, so repeat runs revalidate
+# with ETag/Last-Modified and skip unchanged downloads.
+_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                       max_retries=Retry(total=3, backoff_factor=0.3,
+                                         status_forcelist=[429, 500, 502, 503, 504],
+                                         allowed_methods=["GET"],
+                                         respect_retry_after_header=True))
+
+def _configure_session(session):
+    # requests' default Accept-Encoding already offers br when the brotli
+    # package (in requirements) is installed.
+    session.headers.update({"User-Agent": "Mozilla/5.0"})
+    session.mount("http://", _ADAPTER)
+    session.mount("https://", _ADAPTER)
+    atexit.register(session.close)
+    return session
+
+_SESSION = _configure_session(requests.Session())
+_CACHED_SESSION = _configure_session(requests_cache.CachedSession(
+    "output/http_cache.sqlite", backend="sqlite", expire_after=3600, cache_control=True))
+
+# Static and API sites are scraped concurrently; cap in-flight requests per
+# origin (for both kinds) so a config with many pages on one host does not
+# hammer it.
+MAX_WORKERS = 20
+MAX_REQUESTS_PER_HOST = 4
+_HOST_SLOTS = defaultdict(lambda: threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST))
+_HOST_SLOTS_LOCK = threading.Lock()
+
+# Resources Chrome never needs to download. Stylesheets are deliberately not
+# blocked: innerText depends on computed styles, so dropping CSS changes the
+# scraped text.
+BLOCKED_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.woff", "*.woff2",
+                "*.ttf", "*.mp4", "*google-analytics*", "*googletagmanager*", "*doubleclick*"]
+
 # ---------- HELPER FUNCTIONS ----------
 
+# Compiled CSS selectors are shared across pages and across sites.
+compile_selector = lru_cache(maxsize=256)(soupsieve.compile)
+
+# Templated pagination links give repeated (base, href) pairs when several
+# configured sites share a base URL.
+join_url = lru_cache(maxsize=1024)(urljoin)
+
+def host_of(url):
+    return url.replace("https://", "").replace("http://", "").split("/")[0]
+
+def header_charset(response):
+    # Only an explicit charset: requests' response.encoding falls back to
+    # ISO-8859-1 for text/*, which would override a correct <meta charset>.
+    message = Message()
+    message["content-type"] = response.headers.get("Content-Type", "")
+    return message.get_content_charset()
+
+def _host_slot(url):
+    host = urlsplit(url).netloc
+    with _HOST_SLOTS_LOCK:
+        return _HOST_SLOTS[host]
+
 def get_driver(browser):
-    options = Options()
-    options.add_argument("--headless")
     try:
         if browser.lower() == "chrome":
-            return webdriver.Chrome(options=options)
+            options = Options()
+            options.add_argument("--headless")
+            options.page_load_strategy = "eager"
+            # Image bytes are never needed: only their src attributes are scraped.
+            for arg in ["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage",
+                        "--blink-settings=imagesEnabled=false"]:
+                options.add_argument(arg)
+            driver = webdriver.Chrome(options=options)
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+            return driver
         elif browser.lower() == "firefox":
+            options = FirefoxOptions()
+            options.add_argument("--headless")
+            options.page_load_strategy = "eager"
             return webdriver.Firefox(options=options)
         elif browser.lower() == "safari":
-            return webdriver.Safari(options=options)
+            return webdriver.Safari()
         else:
             raise ValueError(f"Unsupported browser: {browser}")
     except Exception as e:
         logging.error(f"Failed to initialize {browser} driver: {e}")
         raise
 
+class DriverPool:
+    """Lazily starts one driver per thread and browser and reuses it across sites."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._drivers = []
+
+    @contextmanager
+    def driver(self, browser):
+        drivers = getattr(self._local, "drivers", None)
+        if drivers is None:
+            drivers = self._local.drivers = {}
+        key = browser.lower()
+        if key not in drivers:
+            drivers[key] = get_driver(browser)
+            with self._lock:
+                self._drivers.append(drivers[key])
+        driver = drivers[key]
+        try:
+            yield driver
+        finally:
+            # scrape_dynamic swallows most WebDriver errors, so probe the
+            # session instead: a crashed browser must not be handed to the
+            # next site.
+            if not self._is_alive(driver):
+                logging.warning(f"Discarding dead {browser} driver")
+                del drivers[key]
+                with self._lock:
+                    self._drivers.remove(driver)
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _is_alive(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            # A dead session raises WebDriverException; an exited chromedriver
+            # surfaces as urllib3 connection errors (MaxRetryError).
+            return False
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logging.warning(f"Failed to quit driver: {e}")
+
+# Evaluates every field selector in the browser and returns all matches in a
+# single WebDriver round-trip. A selector that fails maps to null. Selectors are
+# inlined as constants so the script text is identical for every call on a site.
+EXTRACT_JS_TEMPLATE = """
+const SELECTORS = %s;
+function extract() {
+    const out = {};
+    for (const [name, selector] of Object.entries(SELECTORS)) {
+        try {
+            out[name] = Array.from(document.querySelectorAll(selector), el => ({
+                text: (el.innerText || "").trim(),
+                src: el.querySelector("img")?.src || null,
+            }));
+        } catch (e) {
+            out[name] = null;
+        }
+    }
+    return out;
+}
+"""
+
+EXTRACT_NOW_JS = "return extract();"
+
+# After a variation click, let the page re-render (two animation frames, or
+# 250 ms if frames are throttled) before extracting, all within one async call.
+EXTRACT_SETTLED_JS = """
+const done = arguments[arguments.length - 1];
+let sent = false;
+const finish = () => {
+    if (!sent) {
+        sent = true;
+        done(extract());
+    }
+};
+requestAnimationFrame(() => requestAnimationFrame(finish));
+setTimeout(finish, 250);
+"""
+
+@lru_cache(maxsize=64)
+def build_extract_js(selector_items, settle=False):
+    return EXTRACT_JS_TEMPLATE % json.dumps(dict(selector_items)) + (EXTRACT_SETTLED_JS if settle else EXTRACT_NOW_JS)
+
+def extract_elements(driver, script, url, settle=False):
+    try:
+        if settle:
+            return driver.execute_async_script(script) or {}
+        return driver.execute_script(script) or {}
+    except Exception as e:
+        logging.warning(f"Bulk element extraction failed on {url}: {e}")
+        return {}
+
+# Whether a variation option is the one currently chosen: native inputs and
+# <option>s report it directly, custom swatches through ARIA state or a class.
+IS_SELECTED_JS = """
+const el = arguments[0];
+if (el.matches("option")) return el.selected;
+const input = el.matches("input") ? el : el.querySelector("input[type=radio], input[type=checkbox]");
+if (input && (input.type === "radio" || input.type === "checkbox")) return input.checked;
+for (const node of [el, el.parentElement]) {
+    if (!node) continue;
+    for (const attr of ["aria-checked", "aria-selected", "aria-pressed"]) {
+        if (node.getAttribute(attr) === "true") return true;
+    }
+}
+// Class check on the option itself only: wrapper classes like
+// "selected-options" would otherwise mark every option as chosen.
+return /(^|[\\s_-])(active|selected|checked|current)($|[\\s_-])/i.test(el.getAttribute("class") || "");
+"""
+
+# Upper bound only: the wait ends as soon as the fields change, the option
+# re-renders or it reports itself selected.
+VARIATION_WAIT = 2
+
+def is_selected_option(driver, element):
+    return bool(driver.execute_script(IS_SELECTED_JS, element))
+
+def click_and_wait_for_change(driver, element, script, url):
+    """Select a variation option and wait until the scraped fields differ from
+    their pre-click values, the option re-renders (goes stale) or it shows as
+    selected. Options that are already selected are not clicked."""
+    if is_selected_option(driver, element):
+        return
+    before = extract_elements(driver, script, url)
+    driver.execute_script("arguments[0].click();", element)
+    is_stale = EC.staleness_of(element)
+    try:
+        WebDriverWait(driver, VARIATION_WAIT, ignored_exceptions=[StaleElementReferenceException]).until(
+            lambda d: is_stale(d) or is_selected_option(d, element) or extract_elements(d, script, url) != before)
+    except TimeoutException:
+        pass
+
+def extract_fields(driver, script, extractors, url, settle=False, context=""):
+    raw = extract_elements(driver, script, url, settle)
+    data = {}
+    any_data_found = False
+    for name, extractor in extractors.items():
+        elements = raw.get(name)
+        if elements is None:
+            logging.warning(f"Error scraping {name}{context} on {url}")
+            data[name] = None
+        elif elements:
+            any_data_found = True
+            data[name] = extractor(elements)
+        else:
+            data[name] = None
+    return data, any_data_found
+
+# Product pages commonly embed their full variant matrix as schema.org JSON-LD
+# (a ProductGroup with hasVariant); reading it avoids clicking every combination.
+JSON_LD_JS = """
+const blocks = [];
+for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+    try {
+        blocks.push(JSON.parse(script.textContent));
+    } catch (e) {}
+}
+return blocks;
+"""
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value] if value else []
+
+def _ld_value(value, keys=("name",)):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = next((value[key] for key in (*keys, "value") if value.get(key) is not None), None)
+    return str(value).strip() if value is not None and value != "" else None
+
+def _ld_images(value):
+    images = [image if isinstance(image, str) else _ld_value(image, ("url", "contentUrl"))
+              for image in _as_list(value)]
+    return [image for image in images if image]
+
+def embedded_variations(driver, url):
+    try:
+        blocks = driver.execute_script(JSON_LD_JS) or []
+    except Exception as e:
+        logging.warning(f"Failed to read embedded product data on {url}: {e}")
+        return []
+
+    variations = []
+    nodes = list(blocks)
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, list):
+            nodes.extend(node)
+        elif isinstance(node, dict):
+            nodes.extend(_as_list(node.get("@graph")))
+            for variant in _as_list(node.get("hasVariant")):
+                if not isinstance(variant, dict):
+                    continue
+                variations.append({
+                    "color": _ld_value(variant.get("color")),
+                    "size": _ld_value(variant.get("size")),
+                    "name": _ld_value(variant.get("name")),
+                    "sku": _ld_value(variant.get("sku")),
+                    "price": _ld_value(variant.get("offers"), ("price", "lowPrice")),
+                    # Absolute, like the src values read in the browser.
+                    "images": [join_url(url, image) for image in _ld_images(variant.get("image"))],
+                })
+    return variations
+
+# Configured field names (lower-cased) that a JSON-LD variant can fill itself.
+# "colors"/"sizes" are page-level option lists, taken from the whole group.
+VARIANT_FIELDS = {"title": "name", "name": "name", "sku": "sku", "price": "price",
+                  "image": "images", "images": "images"}
+
+def _match_labels(values, labels):
+    """Map variant values to the on-page option labels, or None if they differ."""
+    if labels is None:
+        return {} if not any(values) else None
+    by_key = {label.lower(): label for label in labels}
+    if set(by_key) != {value.lower() for value in values if value}:
+        return None
+    return by_key
+
+def embedded_variation_rows(variations, field_names, color_labels, size_labels):
+    """Build one row per JSON-LD variant, or return None when any configured
+    field or option label cannot be filled from it so the caller clicks instead."""
+    if not variations:
+        return None
+    colors = _match_labels([v["color"] for v in variations], color_labels)
+    sizes = _match_labels([v["size"] for v in variations], size_labels)
+    if colors is None or sizes is None:
+        return None
+    group = {"colors": list(colors.values()), "sizes": list(sizes.values())}
+
+    rows = []
+    for variation in variations:
+        row = {
+            "variation_color": colors.get((variation["color"] or "").lower(), "N/A"),
+            "variation_size": sizes.get((variation["size"] or "").lower(), "N/A"),
+        }
+        for name in field_names:
+            key = name.lower()
+            value = group.get(key) if key in group else variation.get(VARIANT_FIELDS.get(key))
+            if not value:
+                return None
+            row[name] = value
+        rows.append(row)
+    return rows
+
+def append_row(columns, row):
+    """Append a row dict to column lists, padding columns first seen late with None."""
+    n_rows = len(next(iter(columns.values()), []))
+    for name in row:
+        if name not in columns:
+            columns[name] = [None] * n_rows
+    for name, values in columns.items():
+        values.append(row.get(name))
+
+# Per-field extractors, chosen once per site by lower-cased field name. Static
+# extractors take BeautifulSoup tags; dynamic ones take the {text, src} dicts
+# returned by the extraction script.
+VARIATION_KEYS = frozenset(["color_variation", "size_variation"])
+
+def _static_text(elements):
+    texts = [text for text in (el.get_text(strip=True) for el in elements) if text]
+    return texts if len(texts) > 1 else texts[0] if texts else None
+
+STATIC_EXTRACTORS = {
+    "images": lambda elements: [el.get("src") for el in elements if el.get("src")],
+    "colors": lambda elements: [el.get_text(strip=True) for el in elements],
+    "sizes": lambda elements: [el.get_text(strip=True) for el in elements],
+}
+
+def _dynamic_texts(elements):
+    return [el["text"] for el in elements if el["text"]]
+
+def _dynamic_text(elements):
+    texts = _dynamic_texts(elements)
+    return texts[0] if texts else None
+
+DYNAMIC_EXTRACTORS = {
+    "images": lambda elements: [el["src"] for el in elements if el["src"]],
+    "colors": _dynamic_texts,
+    "sizes": _dynamic_texts,
+}
+
 # ---------- SCRAPER FUNCTIONS ----------
 
 def scrape_static(url, selectors, pagination_selector=None, limit=5):
-    results = []
+    results = {}
     current_url = url
     pages_scraped = 0
+    fields = [(name, compile_selector(selector), STATIC_EXTRACTORS.get(name.lower(), _static_text))
+              for name, selector in selectors.items()]
+    compiled_pagination = compile_selector(pagination_selector) if pagination_selector else None
 
     while current_url and pages_scraped < limit:
         try:
-            response = requests.get(current_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+            with _host_slot(current_url):
+                response = _CACHED_SESSION.get(current_url, timeout=10)
             response.raise_for_status()
         except RequestException as e:
             logging.error(f"Failed to fetch {current_url}: {e}")
             break
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(response.content, "lxml", from_encoding=header_charset(response))
 
         data = {}
         any_data_found = False
-        for name, selector in selectors.items():
-            elements = soup.select(selector)
+        for name, selector, extractor in fields:
+            elements = selector.select(soup)
             if elements:
                 any_data_found = True
-                if name.lower() in ["images", "colors", "sizes"]:
-                    data[name] = [el.get("src") if name.lower() == "images" else el.get_text(strip=True) for el in elements]
-                else:
-                    texts = [el.get_text(strip=True) for el in elements if el.get_text(strip=True)]
-                    data[name] = texts if len(texts) > 1 else texts[0] if texts else None
+                data[name] = extractor(elements)
             else:
                 data[name] = None
         if any_data_found:
-            results.append(data)
+            append_row(results, data)
 
-        if pagination_selector:
-            next_page = soup.select_one(pagination_selector)
+        if compiled_pagination is not None:
+            next_page = compiled_pagination.select_one(soup)
             if next_page and next_page.get("href"):
-                current_url = urljoin(url, next_page["href"])
+                current_url = join_url(url, next_page["href"])
             else:
                 current_url = None
         else:
@@ -82,58 +459,54 @@ def scrape_static(url, selectors, pagination_selector=None, limit=5):
 
     return results
 
-def scrape_dynamic(url, selectors, pagination_selector=None, limit=5, browser="chrome"):
-    driver = get_driver(browser)
-    results = []
+def scrape_dynamic(driver, url, selectors, pagination_selector=None, limit=5):
+    results = {}
     current_url = url
     pages_scraped = 0
+    field_selectors = {name: selector for name, selector in selectors.items()
+                       if name not in VARIATION_KEYS}
+    extractors = {name: DYNAMIC_EXTRACTORS.get(name.lower(), _dynamic_text) for name in field_selectors}
+    color_variation_selector = selectors.get("color_variation")
+    size_variation_selector = selectors.get("size_variation")
+    extract_js = build_extract_js(tuple(field_selectors.items()))
+    settled_extract_js = build_extract_js(tuple(field_selectors.items()), settle=True)
 
-    try:
-        while current_url and pages_scraped < limit:
-            driver.get(current_url)
-            try:
-                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.ty-product-block-title bdi")))
-            except Exception as e:
-                logging.error(f"Timeout waiting for elements on {current_url}: {e}")
-                break
-
-            # --- Base data without variations ---
-            base_data = {}
-            any_data_found = False
-            for name, selector in selectors.items():
-                if name in ["color_variation", "size_variation"]:
-                    continue
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        any_data_found = True
-                        if name.lower() in ["images"]:
-                            base_data[name] = [el.find_element(By.TAG_NAME, "img").get_attribute("src") for el in elements if el.find_element(By.TAG_NAME, "img").get_attribute("src")]
-                        elif name.lower() in ["colors", "sizes"]:
-                            base_data[name] = [el.text.strip() for el in elements if el.text.strip()]
-                        else:
-                            texts = [el.text.strip() for el in elements if el.text.strip()]
-                            base_data[name] = texts[0] if texts else None
-                    else:
-                        base_data[name] = None
-                except Exception as e:
-                    logging.warning(f"Error scraping {name} on {current_url}: {e}")
-                    base_data[name] = None
-            if any_data_found:
-                results.append(base_data)
-
-            # --- Variation combinations (colors and sizes) ---
-            color_variation_selector = selectors.get("color_variation")
-            size_variation_selector = selectors.get("size_variation")
-            if color_variation_selector or size_variation_selector:
-                color_elements = driver.find_elements(By.CSS_SELECTOR, color_variation_selector) if color_variation_selector else [None]
-                size_elements = driver.find_elements(By.CSS_SELECTOR, size_variation_selector) if size_variation_selector else [None]
+    while current_url and pages_scraped < limit:
+        driver.get(current_url)
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.ty-product-block-title bdi")))
+        except Exception as e:
+            logging.error(f"Timeout waiting for elements on {current_url}: {e}")
+            break
 
+        # --- Base data without variations ---
+        base_data, any_data_found = extract_fields(driver, extract_js, extractors, current_url)
+        if any_data_found:
+            append_row(results, base_data)
+
+        # --- Variation combinations (colors and sizes) ---
+        if color_variation_selector or size_variation_selector:
+            color_elements = driver.find_elements(By.CSS_SELECTOR, color_variation_selector) if color_variation_selector else [None]
+            size_elements = driver.find_elements(By.CSS_SELECTOR, size_variation_selector) if size_variation_selector else [None]
+
+            # Read every label once, before any click: clicks may re-render the
+            # options and leave the element references stale, and size labels
+            # would otherwise be re-fetched for every color.
+            color_labels = [el.text.strip() if el else "N/A" for el in color_elements]
+            size_labels = [el.text.strip() if el else "N/A" for el in size_elements]
+
+            embedded = embedded_variation_rows(
+                embedded_variations(driver, current_url), field_selectors,
+                color_labels if color_variation_selector else None,
+                size_labels if size_variation_selector else None)
+            for row in embedded or []:
+                append_row(results, row)
+
+            if embedded is None:
                 for color_idx, color_el in enumerate(color_elements):
                     if color_el:
                         try:
-                            driver.execute_script("arguments[0].click();", color_el)
-                            WebDriverWait(driver, 5).until(EC.staleness_of(color_el) or EC.presence_of_element_located((By.CSS_SELECTOR, "h1.ty-product-block-title bdi")))
+                            click_and_wait_for_change(driver, color_el, extract_js, current_url)
                         except Exception as e:
                             logging.warning(f"Error clicking color {color_idx} on {current_url}: {e}")
                             continue
@@ -141,124 +514,132 @@ def scrape_dynamic(url, selectors, pagination_selector=None, limit=5, browser="c
                     for size_idx, size_el in enumerate(size_elements):
                         if size_el:
                             try:
-                                driver.execute_script("arguments[0].click();", size_el)
-                                WebDriverWait(driver, 5).until(EC.staleness_of(size_el) or EC.presence_of_element_located((By.CSS_SELECTOR, "h1.ty-product-block-title bdi")))
+                                click_and_wait_for_change(driver, size_el, extract_js, current_url)
                             except Exception as e:
                                 logging.warning(f"Error clicking size {size_idx} on {current_url}: {e}")
                                 continue
 
-                        var_data = {
-                            "variation_color": color_el.text.strip() if color_el else "N/A",
-                            "variation_size": size_el.text.strip() if size_el else "N/A"
-                        }
-                        any_var_data_found = False
-                        for name, selector in selectors.items():
-                            if name in ["color_variation", "size_variation"]:
-                                continue
-                            try:
-                                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                                if elements:
-                                    any_var_data_found = True
-                                    if name.lower() in ["images"]:
-                                        var_data[name] = [el.find_element(By.TAG_NAME, "img").get_attribute("src") for el in elements if el.find_element(By.TAG_NAME, "img").get_attribute("src")]
-                                    elif name.lower() in ["colors", "sizes"]:
-                                        var_data[name] = [el.text.strip() for el in elements if el.text.strip()]
-                                    else:
-                                        texts = [el.text.strip() for el in elements if el.text.strip()]
-                                        var_data[name] = texts[0] if texts else None
-                                else:
-                                    var_data[name] = None
-                            except Exception as e:
-                                logging.warning(f"Error scraping {name} for variation (color {color_idx}, size {size_idx}) on {current_url}: {e}")
-                                var_data[name] = None
+                        fields, any_var_data_found = extract_fields(
+                            driver, settled_extract_js, extractors, current_url, settle=True,
+                            context=f" for variation (color {color_idx}, size {size_idx})")
                         if any_var_data_found:
-                            results.append(var_data)
+                            append_row(results, {"variation_color": color_labels[color_idx], "variation_size": size_labels[size_idx], **fields})
 
-            if pagination_selector:
-                try:
-                    next_btn = driver.find_element(By.CSS_SELECTOR, pagination_selector)
-                    driver.execute_script("arguments[0].click();", next_btn)
-                    WebDriverWait(driver, 5).until(EC.url_changes(current_url))
-                    current_url = driver.current_url
-                except Exception as e:
-                    logging.info(f"No next page found on {current_url}: {e}")
-                    current_url = None
-            else:
+        if pagination_selector:
+            try:
+                next_btn = driver.find_element(By.CSS_SELECTOR, pagination_selector)
+                driver.execute_script("arguments[0].click();", next_btn)
+                WebDriverWait(driver, 5).until(EC.url_changes(current_url))
+                current_url = driver.current_url
+            except Exception as e:
+                logging.info(f"No next page found on {current_url}: {e}")
                 current_url = None
+        else:
+            current_url = None
 
-            pages_scraped += 1
-            logging.info(f"Scraped dynamic page {pages_scraped} from {current_url}")
-
-    finally:
-        driver.quit()
+        pages_scraped += 1
+        logging.info(f"Scraped dynamic page {pages_scraped} from {current_url}")
 
     return results
 
-def scrape_api(url, json_path, headers=None, retries=3):
-    for attempt in range(retries):
-        try:
-            response = requests.get(url, headers=headers or {}, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            for key in json_path:
-                data = data.get(key, {})
-            logging.info(f"Successfully fetched API data from {url}")
-            return [data] if isinstance(data, dict) else data
-        except RequestException as e:
-            logging.warning(f"API attempt {attempt + 1} failed for {url}: {e}")
-            if attempt == retries - 1:
-                logging.error(f"API failed after {retries} attempts: {url}")
-                return None
-            time.sleep(2)
+def scrape_api(url, json_path, headers=None):
+    try:
+        with _host_slot(url):
+            response = _SESSION.get(url, headers=headers or {}, timeout=10)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        for key in json_path:
+            data = data.get(key, {})
+        logging.info(f"Successfully fetched API data from {url}")
+        return [data] if isinstance(data, dict) else data
+    except (RequestException, orjson.JSONDecodeError) as e:
+        logging.error(f"API failed for {url}: {e}")
+        return None
 
 # ---------- MAIN SCRAPER ----------
 
+def scrape_site(site, driver_pool):
+    logging.info(f"Scraping {site['url']} (type: {site['type']})")
+    if site["type"] == "static":
+        return scrape_static(site["url"], site["selectors"],
+                             site.get("pagination"), site.get("limit", 5))
+    elif site["type"] == "dynamic":
+        with driver_pool.driver(site.get("browser", "chrome")) as driver:
+            return scrape_dynamic(driver, site["url"], site["selectors"],
+                                  site.get("pagination"), site.get("limit", 5))
+    elif site["type"] == "api":
+        headers = {"Authorization": f"Bearer {site['api_key']}"} if "api_key" in site else {}
+        return scrape_api(site["url"], site["json_path"], headers)
+
+def unique_sheet_name(name, existing):
+    # Excel sheet names are case-insensitive; number repeats the way openpyxl
+    # did (shoes, shoes1, ...) instead of letting xlsxwriter abort the run.
+    taken = {sheet.lower() for sheet in existing}
+    candidate, n = name, 1
+    while candidate.lower() in taken:
+        suffix = str(n)
+        candidate = name[:31 - len(suffix)] + suffix
+        n += 1
+    return candidate
+
+def save_sheet(writer, idx, site, data, output_file):
+    if not data:
+        logging.warning(f"No data scraped for {site['url']}")
+        return
+    df = pd.DataFrame(data)
+    if df.empty:
+        logging.warning(f"No valid data to save for {site['url']}")
+        return
+    for col in df.columns:
+        is_list = df[col].map(type).eq(list)
+        if is_list.any():
+            df.loc[is_list, col] = df.loc[is_list, col].str.join(", ")
+    for col in ["variation_color", "variation_size"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    df.insert(0, "url", site["url"])
+    sheet_name = unique_sheet_name(site.get("name", f"{host_of(site['url'])}_{idx}")[:31], writer.sheets)
+    df.to_excel(writer, sheet_name=sheet_name, index=False)
+    logging.info(f"Saved data to sheet {sheet_name} in {output_file}")
+
 def run_scraper(config_file="config.json", output_file="output/scraped_data.xlsx"):
     Path("output").mkdir(exist_ok=True)
 
     try:
-        with open(config_file, "r", encoding="utf-8") as f:
-            configs = json.load(f)
+        with open(config_file, "rb") as f:
+            configs = orjson.loads(f.read())
     except Exception as e:
         logging.error(f"Failed to load config file {config_file}: {e}")
         return
 
-    with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-        for idx, site in enumerate(configs.get("websites", [])):
-            if not all(key in site for key in ["url", "type", "selectors"]):
-                logging.error(f"Invalid config for {site.get('name', 'unknown')}: missing required fields")
-                continue
-
-            logging.info(f"Scraping {site['url']} (type: {site['type']})")
-            data = []
-
-            if site["type"] == "static":
-                data = scrape_static(site["url"], site["selectors"],
-                                   site.get("pagination"), site.get("limit", 5))
-            elif site["type"] == "dynamic":
-                data = scrape_dynamic(site["url"], site["selectors"],
-                                    site.get("pagination"), site.get("limit", 5),
-                                    site.get("browser", "chrome"))
-            elif site["type"] == "api":
-                headers = {"Authorization": f"Bearer {site['api_key']}"} if "api_key" in site else {}
-                data = scrape_api(site["url"], site["json_path"], headers)
-            else:
-                logging.warning(f"Unknown type: {site['type']} for {site['url']}")
-                continue
-
-            if data:
-                df = pd.DataFrame(data)
-                if df.empty:
-                    logging.warning(f"No valid data to save for {site['url']}")
-                    continue
-                for col in df.columns:
-                    df[col] = df[col].apply(lambda x: ", ".join(x) if isinstance(x, list) else x)
-                df.insert(0, "url", site["url"])
-                sheet_name = site.get("name", f"{site['url'].replace('https://', '').replace('http://', '').split('/')[0]}_{idx}")[:31]
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                logging.info(f"Saved data to sheet {sheet_name} in {output_file}")
-            else:
-                logging.warning(f"No data scraped for {site['url']}")
+    sites = []
+    for idx, site in enumerate(configs.get("websites", [])):
+        if not all(key in site for key in ["url", "type", "selectors"]):
+            logging.error(f"Invalid config for {site.get('name', 'unknown')}: missing required fields")
+        elif site["type"] in ("static", "api", "dynamic"):
+            sites.append((idx, site))
+        else:
+            logging.warning(f"Unknown type: {site['type']} for {site['url']}")
+    concurrent_count = sum(site["type"] != "dynamic" for _, site in sites)
+
+    # Static and API sites only wait on the network, so they run in a thread
+    # pool while Selenium sites run here, sequentially on one reused driver.
+    # Sheets are written from this thread in config order because ExcelWriter
+    # is not thread-safe. URLs are written as plain strings: xlsxwriter drops
+    # hyperlink cells over 2079 characters or past 65,530 links per sheet.
+    driver_pool = DriverPool()
+    try:
+        with pd.ExcelWriter(output_file, engine="xlsxwriter",
+                            engine_kwargs={"options": {"strings_to_urls": False}}) as writer, \
+                ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, concurrent_count))) as executor:
+            futures = {idx: executor.submit(scrape_site, site, driver_pool)
+                       for idx, site in sites if site["type"] != "dynamic"}
+
+            for idx, site in sites:
+                data = futures[idx].result() if idx in futures else scrape_site(site, driver_pool)
+                save_sheet(writer, idx, site, data, output_file)
+    finally:
+        driver_pool.close()
 
     logging.info(f"Completed scraping. Data saved to {output_file}")
 